@@ -1,7 +1,16 @@
-from .core.input_mapper import generate_household
-from .core.output_mapper import export_household
 from .cli import main as cli
 
 __all__ = ["generate_household", "export_household", "cli"]
 
 __version__ = "0.1.0"  # Make sure this matches the version in pyproject.toml
+
+
+def __getattr__(name):
+    # Delay imports until first use; the mappers pull in policyengine-us
+    if name == "generate_household":
+        from .core.input_mapper import generate_household
+        return generate_household
+    if name == "export_household":
+        from .core.output_mapper import export_household
+        return export_household
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
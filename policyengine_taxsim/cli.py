@@ -1,14 +1,19 @@
 import click
-import pandas as pd
 from pathlib import Path
-from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-try:
-    from .core.input_mapper import generate_household
-    from .core.output_mapper import export_household
-except ImportError:
-    from policyengine_taxsim.core.input_mapper import generate_household
-    from policyengine_taxsim.core.output_mapper import export_household
+
+# Delay imports until runtime
+def get_mappers():
+    if __package__:
+        from .core.input_mapper import generate_household
+        from .core.output_mapper import export_household
+    else:
+        # Running as a script, e.g. python policyengine_taxsim/cli.py
+        from policyengine_taxsim.core.input_mapper import generate_household
+        from policyengine_taxsim.core.output_mapper import export_household
+    return generate_household, export_household
 
 
 @click.command()
@@ -21,43 +26,54 @@ except ImportError:
     help="Output file path",
 )
 @click.option('--logs', is_flag=True, help='Generate PE YAML Tests Logs')
-def main(input_file, output, logs):
+@click.option(
+    "--workers",
+    "-w",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes used to simulate records",
+)
+def main(input_file, output, logs, workers):
     """
     Process TAXSIM input file and generate PolicyEngine-compatible output.
     """
+    import pandas as pd
+
     try:
         # Read input file
         df = pd.read_csv(input_file)
+        records = df.to_dict(orient="records")
+
+        # Process each row; records are independent, so they can be simulated in parallel
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(process_record, records, repeat(logs)))
+        else:
+            results = [process_record(taxsim_input, logs) for taxsim_input in records]
 
-        # Process each row
         idtl_0_results = []
         idtl_2_results = []
-        idtl_5_results = ""
-
-        for _, row in df.iterrows():
-            taxsim_input = row.to_dict()
-            pe_situation = generate_household(taxsim_input)
-
-            taxsim_output = export_household(taxsim_input, pe_situation, logs)
+        idtl_5_results = []
 
-            idtl = taxsim_input['idtl']
+        for idtl, taxsim_output in results:
             if idtl == 0:
                 idtl_0_results.append(taxsim_output)
             elif idtl == 2:
                 idtl_2_results.append(taxsim_output)
             else:
-                idtl_5_results += taxsim_output
+                idtl_5_results.append(taxsim_output)
 
         idtl_0_output = to_csv_str(idtl_0_results)
         idtl_2_output = to_csv_str(idtl_2_results)
+        idtl_5_output = "".join(idtl_5_results)
 
         output_str = ""
         if idtl_0_output:
             output_str += idtl_0_output
         if idtl_2_output:
             output_str += f"\n{idtl_2_output}"
-        if idtl_5_results:
-            output_str += f"\n{idtl_5_results}"
+        if idtl_5_output:
+            output_str += f"\n{idtl_5_output}"
 
         print(output_str)
     except Exception as e:
@@ -65,14 +81,27 @@ def main(input_file, output, logs):
         raise
 
 
+def process_record(taxsim_input, logs):
+    """
+    Simulate a single TAXSIM input record.
+
+    Returns:
+        tuple: The record's output type (idtl) and its TAXSIM output
+    """
+    generate_household, export_household = get_mappers()
+    pe_situation = generate_household(taxsim_input)
+    taxsim_output = export_household(taxsim_input, pe_situation, logs)
+    return taxsim_input['idtl'], taxsim_output
+
+
 def to_csv_str(results):
-    if len(results) == 0 or results is None:
+    if not results:
         return ""
 
+    import pandas as pd
+
     df = pd.DataFrame(results)
-    content = df.to_csv(index=False, float_format='%.1f', lineterminator='\n')
-    cleaned_df = pd.read_csv(StringIO(content))
-    return cleaned_df.to_csv(index=False, lineterminator='\n')
+    return df.to_csv(index=False, float_format='%.1f', lineterminator='\n')
 
 
 if __name__ == "__main__":
@@ -2,82 +2,151 @@ from .utils import (
     load_variable_mappings,
     get_state_code, get_ordinal,
 )
-import copy
+from functools import lru_cache
 
+# Sentinel for TAXSIM variables absent from a record, so presence and value take one lookup
+MISSING = object()
 
-def add_additional_units(state, year, situation, taxsim_vars):
+# Defaults for TAXSIM variables that are missing or falsy, applied by set_taxsim_defaults
+TAXSIM_DEFAULTS = {
+    "state": 44,  # Texas
+    "depx": 0,  # Number of dependents
+    "mstat": 1,  # Marital status
+    "taxsimid": 0,  # TAXSIM ID
+    "idtl": 0  # output flag
+}
 
-    additional_tax_units_config = load_variable_mappings()["taxsim_to_policyengine"]["household_situation"]["additional_tax_units"]
-    additional_income_units_config = load_variable_mappings()["taxsim_to_policyengine"]["household_situation"]["additional_income_units"]
 
-    tax_unit = situation["tax_units"]["your tax unit"]
+def copy_template(data):
+    """
+    Copy a template made of nested dicts and lists of plain values.
+
+    A targeted replacement for copy.deepcopy on YAML-loaded data, which has
+    no shared references or custom objects to track.
+    """
+    if isinstance(data, dict):
+        return {key: copy_template(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [copy_template(item) for item in data]
+    return data
+
+
+def set_state_use_tax(situation, unit, field, values, taxsim_vars, state, year):
+    if state.lower() in values:
+        unit[f"{state}_use_tax"] = {year: 0}
+
+
+def set_self_employment_income(situation, unit, field, values, taxsim_vars, state, year):
     people_unit = situation["people"]
+    if "psemp" in taxsim_vars:
+        unit[field] = {year: taxsim_vars.get("psemp", 0)}
+    if "your partner" in people_unit and "ssemp" in taxsim_vars:
+        people_unit["your partner"][field] = {year: taxsim_vars.get("ssemp", 0)}
 
-    for item in additional_tax_units_config:
-        for field, values in item.items():
-            if not values:
-                continue
 
-            if field == "state_use_tax":
-                if state.lower() in values:
-                    tax_unit[f"{state}_use_tax"] = {str(year): 0}
-                continue
+def set_sum_of_values(situation, unit, field, values, taxsim_vars, state, year):
+    matching_values = [
+        value
+        for value in (taxsim_vars.get(name, MISSING) for name in values)
+        if value is not MISSING
+    ]
+    if matching_values:
+        unit[field] = {year: sum(matching_values)}
+
+
+def set_single_value(situation, unit, field, values, taxsim_vars, state, year):
+    value = taxsim_vars.get(values[0], MISSING)
+    if value is not MISSING:
+        unit[field] = {year: value}
 
-            if len(values) > 1:
-                matching_values = [
-                    taxsim_vars.get(value, 0)
-                    for value in values
-                    if value in taxsim_vars
-                ]
-                if matching_values:
-                    tax_unit[field] = {str(year): sum(matching_values)}
 
-            elif len(values) == 1 and values[0] in taxsim_vars:
-                tax_unit[field] = {str(year): taxsim_vars[values[0]]}
+def compile_unit_rules(config, special_handlers):
+    """
+    Flatten an additional-units config into (field, values, handler) rules.
 
-    for item in additional_income_units_config:
+    Fields without TAXSIM variables are dropped, and each remaining field is
+    paired with the handler that sets it, so records don't re-walk the config.
+    """
+    rules = []
+    for item in config:
         for field, values in item.items():
             if not values:
                 continue
+            if field in special_handlers:
+                handler = special_handlers[field]
+            elif len(values) > 1:
+                handler = set_sum_of_values
+            else:
+                handler = set_single_value
+            rules.append((field, tuple(values), handler))
+    return tuple(rules)
+
+
+@lru_cache(maxsize=None)
+def get_additional_unit_rules():
+    """Compile the additional tax unit and income unit rules once per process."""
+    household_situation_config = load_variable_mappings()["taxsim_to_policyengine"]["household_situation"]
+    return (
+        compile_unit_rules(
+            household_situation_config["additional_tax_units"],
+            {"state_use_tax": set_state_use_tax},
+        ),
+        compile_unit_rules(
+            household_situation_config["additional_income_units"],
+            {"self_employment_income": set_self_employment_income},
+        ),
+    )
 
-            if field == "self_employment_income":
-                if "psemp" in taxsim_vars:
-                    people_unit["you"][field] = {str(year): taxsim_vars.get("psemp", 0)}
-                if "your partner" in people_unit and "ssemp" in taxsim_vars:
-                    people_unit["your partner"][field] = {str(year): taxsim_vars.get("ssemp", 0)}
 
-            elif len(values) > 1:
-                matching_values = [
-                    taxsim_vars.get(value, 0)
-                    for value in values
-                    if value in taxsim_vars
-                ]
-                if matching_values:
-                    people_unit["you"][field] = {str(year): sum(matching_values)}
+def add_additional_units(state, year, situation, taxsim_vars):
+    year = str(year)  # Period key for every PolicyEngine value set below
 
-            elif len(values) == 1 and values[0] in taxsim_vars:
-                people_unit["you"][field] = {str(year): taxsim_vars[values[0]]}
+    tax_unit_rules, income_unit_rules = get_additional_unit_rules()
+
+    tax_unit = situation["tax_units"]["your tax unit"]
+    you = situation["people"]["you"]
+
+    for field, values, handler in tax_unit_rules:
+        handler(situation, tax_unit, field, values, taxsim_vars, state, year)
+
+    for field, values, handler in income_unit_rules:
+        handler(situation, you, field, values, taxsim_vars, state, year)
 
     return situation
 
 
+def make_person(year, age, employment_income):
+    """
+    Build a fresh PolicyEngine person entry.
+
+    Every call returns new dicts: add_additional_units and add_a_dollar
+    update person entries in place, so they must never be shared.
+    """
+    return {
+        "age": {year: age},
+        "employment_income": {year: employment_income}
+    }
+
+
 def form_household_situation(year, state, taxsim_vars):
+    year = str(year)  # Period key for every PolicyEngine value set below
     mappings = load_variable_mappings()["taxsim_to_policyengine"]
 
-    household_situation = copy.deepcopy(mappings["household_situation"])
-    household_situation.pop("additional_tax_units", None)
-    household_situation.pop("additional_income_units", None)
+    household_situation = {
+        key: copy_template(value)
+        for key, value in mappings["household_situation"].items()
+        if key not in ("additional_tax_units", "additional_income_units")
+    }
 
     depx = taxsim_vars["depx"]
     mstat = taxsim_vars["mstat"]
 
+    dependents = [f"your {get_ordinal(i)} dependent" for i in range(1, depx + 1)]
+
     if mstat == 2:  # Married filing jointly
-        members = ["you", "your partner"]
+        members = ["you", "your partner", *dependents]
     else:  # Single, separate, or dependent taxpayer
-        members = ["you"]
-
-    for i in range(1, depx + 1):
-        members.append(f"your {get_ordinal(i)} dependent")
+        members = ["you", *dependents]
 
     household_situation["families"]["your family"]["members"] = members
     household_situation["households"]["your household"]["members"] = members
@@ -91,38 +160,33 @@ def form_household_situation(year, state, taxsim_vars):
                 "members": ["you", "your partner"] if mstat == 2 else ["you"]
             }
         }
-        for i in range(1, depx + 1):
-            dep_name = f"your {get_ordinal(i)} dependent"
+        for i, dep_name in enumerate(dependents, start=1):
             household_situation["marital_units"][f"{dep_name}'s marital unit"] = {
                 "members": [dep_name],
-                "marital_unit_id": {str(year): i}
+                "marital_unit_id": {year: i}
             }
     else:
         household_situation["marital_units"]["your marital unit"]["members"] = (
             ["you", "your partner"] if mstat == 2 else ["you"]
         )
 
-    household_situation["households"]["your household"]["state_name"][str(year)] = state
+    household_situation["households"]["your household"]["state_name"][year] = state
 
     people = household_situation["people"]
 
-    people["you"] = {
-        "age": {str(year): int(taxsim_vars.get("page", 40))},
-        "employment_income": {str(year): float(taxsim_vars.get("pwages", 0))}
-    }
+    people["you"] = make_person(
+        year, int(taxsim_vars.get("page", 40)), float(taxsim_vars.get("pwages", 0))
+    )
 
     if mstat == 2:
-        people["your partner"] = {
-            "age": {str(year): int(taxsim_vars.get("sage", 40))},
-            "employment_income": {str(year): float(taxsim_vars.get("swages", 0))}
-        }
+        people["your partner"] = make_person(
+            year, int(taxsim_vars.get("sage", 40)), float(taxsim_vars.get("swages", 0))
+        )
 
-    for i in range(1, depx + 1):
-        dep_name = f"your {get_ordinal(i)} dependent"
-        people[dep_name] = {
-            "age": {str(year): int(taxsim_vars.get(f"age{i}", 10))},
-            "employment_income": {str(year): 0}
-        }
+    people.update({
+        dep_name: make_person(year, int(taxsim_vars.get(f"age{i}", 10)), 0)
+        for i, dep_name in enumerate(dependents, start=1)
+    })
 
     household_situation = add_additional_units(state.lower(), year, household_situation, taxsim_vars)
 
@@ -146,16 +210,8 @@ def set_taxsim_defaults(taxsim_vars: dict) -> dict:
         - taxsimid: 0 (TAXSIM ID)
         - idtl: 0 (output flag)
     """
-    DEFAULTS = {
-        "state": 44,  # Texas
-        "depx": 0,  # Number of dependents
-        "mstat": 1,  # Marital status
-        "taxsimid": 0,  # TAXSIM ID
-        "idtl": 0  # output flag
-    }
-
-    for key, default_value in DEFAULTS.items():
-        taxsim_vars[key] = int(taxsim_vars.get(key, default_value) or default_value)
+    for key, default_value in TAXSIM_DEFAULTS.items():
+        taxsim_vars[key] = int(taxsim_vars.get(key) or default_value)
 
     return taxsim_vars
 
@@ -2,42 +2,94 @@ from .utils import (
     load_variable_mappings,
     get_state_number, to_roundedup_number,
 )
+from functools import lru_cache
 from policyengine_us import Simulation
 from policyengine_tests_generator.core.generator import PETestsYAMLGenerator
 
+# Configuration for formatting the text description output
+LEFT_MARGIN = 4
+LABEL_INDENT = 4
+LABEL_WIDTH = 45
+VALUE_WIDTH = 15
+SECOND_VALUE_WIDTH = 12
 
-def generate_non_description_output(taxsim_output, mappings, year, state_name, simulation, output_type, logs):
-    outputs = []
-    for key, each_item in mappings.items():
-        if each_item['implemented']:
-            if key == "taxsimid":
-                taxsim_output[key] = taxsim_output["taxsimid"]
-            elif key == "year":
-                taxsim_output[key] = int(year)
-            elif key == "state":
-                taxsim_output[key] = get_state_number(state_name)
-            elif 'variables' in each_item and len(each_item['variables']) > 0:
-                pe_variables = each_item['variables']
-                taxsim_output[key] = simulate_multiple(simulation, pe_variables, year)
-            else:
-                pe_variable = each_item['variable']
-                state_initial = state_name.lower()
+# %-style line templates for the input data section, built once from the configuration above
+# and filled positionally: template % (name, value[, pair])
+INPUT_LINE = f"{' ' * (LEFT_MARGIN + LABEL_INDENT)}%-{LABEL_WIDTH}s%{VALUE_WIDTH}.2f"
+INPUT_PAIR_LINE = f"{INPUT_LINE}%{SECOND_VALUE_WIDTH}.2f"
+INPUT_TEXT_LINE = f"{' ' * (LEFT_MARGIN + LABEL_INDENT)}%-{LABEL_WIDTH}s%{VALUE_WIDTH}s"
+
+# Column headers for groups that show a second ("$1 more") column
+COLUMN_HEADERS = f"{'Base':>{VALUE_WIDTH}}{'':>{SECOND_VALUE_WIDTH}}"
+
+# %-style templates for the text description output, filled per line
+GROUP_HEADER_LINE = f"{' ' * LEFT_MARGIN}%s:"
+GROUP_HEADER_COLUMNS_LINE = f"{' ' * LEFT_MARGIN}%-{LABEL_WIDTH + LABEL_INDENT}s{COLUMN_HEADERS}"
+OUTPUT_LINE = f"{' ' * (LEFT_MARGIN + LABEL_INDENT)}%-{LABEL_WIDTH}s%{VALUE_WIDTH}s"
+OUTPUT_SECOND_VALUE = f"%{SECOND_VALUE_WIDTH}s"
+OUTPUT_NUMBER = "%8.1f"
+
+
+@lru_cache(maxsize=None)
+def resolve_pe_variable(key, state_initial):
+    """
+    Resolve the PolicyEngine variable behind a TAXSIM output for one state.
+
+    Substitutes the state into "state_*" variable names and applies any
+    implemented state special case. The result depends only on the output key
+    and the state, so it is computed once per pair.
+    """
+    each_item = load_variable_mappings()["policyengine_to_taxsim"][key]
+    pe_variable = each_item['variable'].replace("state", state_initial)
+
+    if 'special_cases' in each_item:
+        found_state = next((each for each in each_item['special_cases'] if state_initial in each), None)
+        if found_state and found_state[state_initial]['implemented']:
+            pe_variable = found_state[state_initial]['variable'].replace("state", state_initial)
 
-                if "state" in pe_variable:
-                    pe_variable = pe_variable.replace("state", state_initial)
+    return pe_variable
 
-                for entry in each_item['idtl']:
-                    if output_type in entry.values():
 
-                        if 'special_cases' in each_item:
-                            found_state = next((each for each in each_item['special_cases'] if state_initial in each), None)
-                            if found_state and found_state[state_initial]['implemented']:
-                                pe_variable = found_state[state_initial]['variable'].replace("state", state_initial) if "state" in found_state[state_initial]['variable'] else found_state[state_initial]['variable']
-                        taxsim_output[key] = simulate(simulation, pe_variable, year)
-                        outputs.append({'variable': pe_variable, 'value': taxsim_output[key]})
+@lru_cache(maxsize=None)
+def get_output_mappings(output_type):
+    """
+    Select the implemented TAXSIM outputs reported for an output type (idtl).
+
+    Returns:
+        tuple: (key, mapping) pairs in mapping order, computed once per output type
+    """
+    mappings = load_variable_mappings()["policyengine_to_taxsim"]
+    return tuple(
+        (key, each_item)
+        for key, each_item in mappings.items()
+        if each_item['implemented'] and (
+            key in ("taxsimid", "year", "state")
+            or ('variables' in each_item and len(each_item['variables']) > 0)
+            or any(output_type in entry.values() for entry in each_item['idtl'])
+        )
+    )
+
+
+def generate_non_description_output(taxsim_output, year, state_name, simulation, output_type, logs):
+    outputs = []
+    for key, each_item in get_output_mappings(output_type):
+        if key == "taxsimid":
+            taxsim_output[key] = taxsim_output["taxsimid"]
+        elif key == "year":
+            taxsim_output[key] = int(year)
+        elif key == "state":
+            taxsim_output[key] = get_state_number(state_name)
+        elif 'variables' in each_item and len(each_item['variables']) > 0:
+            pe_variables = each_item['variables']
+            taxsim_output[key] = simulate_multiple(simulation, pe_variables, year)
+        else:
+            pe_variable = resolve_pe_variable(key, state_name.lower())
+            taxsim_output[key] = simulate(simulation, pe_variable, year)
+            outputs.append({'variable': pe_variable, 'value': taxsim_output[key]})
 
-    file_name = f"{taxsim_output['taxsimid']}-{state_name}.yaml"
-    generate_pe_tests_yaml(simulation.situation_input, outputs, file_name, logs)
+    if logs:
+        file_name = f"{taxsim_output['taxsimid']}-{state_name}.yaml"
+        generate_pe_tests_yaml(simulation.situation_input, outputs, file_name, logs)
 
     return taxsim_output
 
@@ -55,8 +107,16 @@ def generate_pe_tests_yaml(household, outputs, file_name, logs):
             f.write(output)
 
 
-def generate_text_description_output(taxsim_input, mappings, year, state_name, simulation, simulation_1dollar_more,
-                                     logs):
+@lru_cache(maxsize=None)
+def get_text_description_layout():
+    """
+    Group and order the outputs shown in the text description (idtl 5).
+
+    Returns:
+        tuple: (group_name, has_second_column, variables) per group in display order, where
+        variables are (text_description, var_name, var_info) sorted by description
+    """
+    mappings = load_variable_mappings()["policyengine_to_taxsim"]
     groups = {}
     group_orders = {}
 
@@ -77,42 +137,34 @@ def generate_text_description_output(taxsim_input, mappings, year, state_name, s
 
             groups[group].append((var_info["text_description"], var_name, var_info))
 
-    # Configuration for formatting
-    LEFT_MARGIN = 4
-    LABEL_INDENT = 4
-    LABEL_WIDTH = 45
-    VALUE_WIDTH = 15
-    SECOND_VALUE_WIDTH = 12
-    GROUP_MARGIN = LEFT_MARGIN  # Groups are 2 tabs left of text_description
+    layout = []
+    for group_name in sorted(groups.keys(), key=lambda x: group_orders[x]):
+        variables = groups[group_name]
+        # Check if this group has any variables with group_column = 2
+        has_second_column = any(var_info.get('group_column', 1) == 2 for _, _, var_info in variables)
+        layout.append((group_name, has_second_column, tuple(sorted(variables, key=lambda x: x[0]))))
+
+    return tuple(layout)
+
 
+def generate_text_description_output(taxsim_input, year, state_name, simulation, simulation_1dollar_more,
+                                     logs):
     lines = [""]
-    sorted_groups = sorted(groups.keys(), key=lambda x: group_orders[x])
     outputs = []
-    for group_name in sorted_groups:
-        variables = groups[group_name]
+    for group_name, has_second_column, variables in get_text_description_layout():
         if variables:
-            # Check if this group has any variables with group_column = 2
-            has_second_column = any(var_info.get('group_column', 1) == 2 for _, _, var_info in variables)
-
+            # Group headers are 2 tabs left of text_description
             if has_second_column:
-                # Group headers are 2 tabs left of text_description
-                line = f"{' ' * GROUP_MARGIN}{group_name}:"
-                padding = ' ' * (LABEL_WIDTH + LABEL_INDENT - len(group_name) - 1)  # -1 for the colon
-                base_text = f"{'Base':>8}"
-                plus_one_text = f"{'':>8}"
-                lines.append(f"{line}{padding}{base_text:>{VALUE_WIDTH}}{plus_one_text:>{SECOND_VALUE_WIDTH}}")
+                lines.append(GROUP_HEADER_COLUMNS_LINE % f"{group_name}:")
             else:
-                # Group headers are 2 tabs left of text_description
-                lines.append(f"{' ' * GROUP_MARGIN}{group_name}:")
+                lines.append(GROUP_HEADER_LINE % group_name)
 
             state_initial = state_name.lower()
 
-            for desc, var_name, each_item in sorted(variables, key=lambda x: x[0]):
-                variable = each_item['variable']
+            for desc, var_name, each_item in variables:
+                variable = resolve_pe_variable(var_name, state_initial)
                 has_second_column = each_item.get('group_column', 1) == 2
 
-                if "state" in variable:
-                    variable = variable.replace("state", state_name).lower()
                 if var_name == "taxsimid":
                     value = taxsim_input['taxsimid']
                 elif var_name == "year":
@@ -122,16 +174,12 @@ def generate_text_description_output(taxsim_input, mappings, year, state_name, s
                 elif 'variables' in each_item and len(each_item['variables']) > 0:
                     value = simulate_multiple(simulation, each_item['variables'], year)
                 else:
-                    if 'special_cases' in each_item:
-                        found_state = next((each for each in each_item['special_cases'] if state_initial in each), None)
-                        if found_state and found_state[state_initial]['implemented']:
-                            variable = found_state[state_initial]['variable'].replace("state", state_initial) if "state" in found_state[state_initial]['variable'] else found_state[state_initial]['variable']
                     value = simulate(simulation, variable, year)
                     outputs.append({'variable': variable, 'value': value})
 
                 # Format the base value
                 if isinstance(value, (int, float)):
-                    formatted_value = f"{value:>8.1f}"
+                    formatted_value = OUTPUT_NUMBER % value
                 else:
                     formatted_value = str(value)
 
@@ -140,34 +188,26 @@ def generate_text_description_output(taxsim_input, mappings, year, state_name, s
                     if 'variables' in each_item and len(each_item['variables']) > 0:
                         second_value = simulate_multiple(simulation_1dollar_more, each_item['variables'], year)
                     else:
-                        if 'special_cases' in each_item:
-                            found_state = next((each for each in each_item['special_cases'] if state_initial in each),
-                                               None)
-                            if found_state and found_state[state_initial]['implemented']:
-                                variable = found_state[state_initial]['variable'].replace("state", state_initial) if "state" in found_state[state_initial]['variable'] else found_state[state_initial]['variable']
                         second_value = simulate(simulation_1dollar_more, variable, year)
 
                     if isinstance(second_value, (int, float)):
-                        formatted_second_value = f"{second_value:>8.1f}"
+                        formatted_second_value = OUTPUT_NUMBER % second_value
                     else:
                         formatted_second_value = str(second_value)
 
                 # Handle multi-line descriptions
                 desc_lines = desc.split('\n')
                 for desc_line_index, desc_line in enumerate(desc_lines):
-                    indent = LEFT_MARGIN + LABEL_INDENT
-                    if has_second_column:
-                        line = f"{' ' * indent}{desc_line:<{LABEL_WIDTH}}{formatted_value:>{VALUE_WIDTH}}"
-                        if desc_line_index == 0:  # Only add second value on first line
-                            line += f"{formatted_second_value:>{SECOND_VALUE_WIDTH}}"
-                    else:
-                        line = f"{' ' * indent}{desc_line:<{LABEL_WIDTH}}{formatted_value:>{VALUE_WIDTH}}"
+                    line = OUTPUT_LINE % (desc_line, formatted_value)
+                    if has_second_column and desc_line_index == 0:  # Only add second value on first line
+                        line += OUTPUT_SECOND_VALUE % formatted_second_value
                     lines.append(line)
 
             lines.append("")
 
-    file_name = f"{taxsim_input['taxsimid']}-{state_name}.yaml"
-    generate_pe_tests_yaml(simulation.situation_input, outputs, file_name, logs)
+    if logs:
+        file_name = f"{taxsim_input['taxsimid']}-{state_name}.yaml"
+        generate_pe_tests_yaml(simulation.situation_input, outputs, file_name, logs)
 
     return "\n".join(lines)
 
@@ -184,13 +224,6 @@ def taxsim_input_definition(data_dict, year, state_name):
         "   Input Data:"
     ])
 
-    # Configuration for formatting
-    LEFT_MARGIN = 4
-    LABEL_INDENT = 4
-    LABEL_WIDTH = 45
-    VALUE_WIDTH = 15
-    SECOND_VALUE_WIDTH = 12
-
     # Process each field from mappings in order
     for mapping in mappings:
         field, config = next(iter(mapping.items()))
@@ -204,47 +237,37 @@ def taxsim_input_definition(data_dict, year, state_name):
                 pair_field = config['pair']
                 pair_value = data_dict[pair_field]
 
-                indent = LEFT_MARGIN + LABEL_INDENT
-                line = f"{' ' * indent}{name:<{LABEL_WIDTH}}{float(value):>{VALUE_WIDTH}.2f}"
-                line += f"{float(pair_value):>{SECOND_VALUE_WIDTH}.2f}"
-                output_lines.append(line)
+                output_lines.append(INPUT_PAIR_LINE % (name, float(value), float(pair_value)))
             else:
                 # Format and append the line
-                indent = LEFT_MARGIN + LABEL_INDENT
-
                 if field == 'mstat' and 'type' in config:
                     try:
                         if isinstance(value, str):
                             if value.lower() == 'single':
-                                output_lines.append(
-                                    f"{' ' * indent}{name:<{LABEL_WIDTH}}{1:>{VALUE_WIDTH}.2f} {value.lower()}")
+                                output_lines.append(f"{INPUT_LINE % (name, 1)} {value.lower()}")
                                 value = 1
                             elif value.lower() == 'joint':
-                                output_lines.append(
-                                    f"{' ' * indent}{name:<{LABEL_WIDTH}}{2:>{VALUE_WIDTH}.2f} {value.lower()}")
+                                output_lines.append(f"{INPUT_LINE % (name, 2)} {value.lower()}")
                                 value = 2
                     except (ValueError, AttributeError) as e:
                         print(e)
 
                 if field == "state":
-                    output_lines.append(f"{' ' * indent}{name:<{LABEL_WIDTH}}{value:>{VALUE_WIDTH}.2f} {state_name}")
+                    output_lines.append(f"{INPUT_LINE % (name, value)} {state_name}")
                 else:
                     try:
                         float_value = float(value)
-                        output_lines.append(f"{' ' * indent}{name:<{LABEL_WIDTH}}{float_value:>{VALUE_WIDTH}.2f}")
+                        output_lines.append(INPUT_LINE % (name, float_value))
                     except (ValueError, TypeError):
-                        output_lines.append(f"{' ' * indent}{name:<{LABEL_WIDTH}}{str(value):>{VALUE_WIDTH}}")
+                        output_lines.append(INPUT_TEXT_LINE % (name, str(value)))
         else:
             # If field doesn't exist in data_dict, output zero
             name = config['name']
-            indent = LEFT_MARGIN + LABEL_INDENT
             # Handle paired fields that don't exist
             if 'pair' in config:
-                line = f"{' ' * indent}{name:<{LABEL_WIDTH}}{0:>{VALUE_WIDTH}.2f}"
-                line += f"{0:>{SECOND_VALUE_WIDTH}.2f}"
-                output_lines.append(line)
+                output_lines.append(INPUT_PAIR_LINE % (name, 0, 0))
             else:
-                output_lines.append(f"{' ' * indent}{name:<{LABEL_WIDTH}}{0:>{VALUE_WIDTH}.2f}")
+                output_lines.append(INPUT_LINE % (name, 0))
 
     return "\n".join(output_lines)
 
@@ -284,32 +307,24 @@ def export_household(taxsim_input, policyengine_situation, logs):
     Returns:
         dict: Dictionary of TAXSIM output variables
     """
-    mappings = load_variable_mappings()["policyengine_to_taxsim"]
-
     simulation = Simulation(situation=policyengine_situation)
 
-    year = list(
-        policyengine_situation["households"]["your household"][
-            "state_name"
-        ].keys()
-    )[0]
-
-    state_name = policyengine_situation["households"]["your household"][
-        "state_name"
-    ][year]
+    state_names = policyengine_situation["households"]["your household"]["state_name"]
+    year = next(iter(state_names))
+    state_name = state_names[year]
 
     taxsim_output = {}
     taxsim_output["taxsimid"] = policyengine_situation.get("taxsimid", taxsim_input['taxsimid'])
     output_type = taxsim_input["idtl"]
 
     if int(output_type) in [0, 2]:
-        return generate_non_description_output(taxsim_output, mappings, year, state_name, simulation,
+        return generate_non_description_output(taxsim_output, year, state_name, simulation,
                                                output_type, logs)
     else:
         input_definitions_lines = taxsim_input_definition(taxsim_input, year, state_name)
         a_dollar_more_situation = add_a_dollar(policyengine_situation)
         simulation_a_dollar_more = Simulation(situation=a_dollar_more_situation)
-        output = generate_text_description_output(taxsim_input, mappings, year, state_name, simulation,
+        output = generate_text_description_output(taxsim_input, year, state_name, simulation,
                                                   simulation_a_dollar_more, logs)
         return f"{input_definitions_lines}\n{output}\n"
 
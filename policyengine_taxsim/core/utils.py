@@ -1,10 +1,16 @@
 import numpy as np
 import yaml
+from functools import lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=None)
 def load_variable_mappings():
-    """Load variable mappings from YAML file."""
+    """Load variable mappings from YAML file.
+
+    The file is parsed once per process and the result is shared, so callers
+    must treat it as read-only and copy anything they need to modify.
+    """
     config_path = (
             Path(__file__).parent.parent / "config" / "variable_mappings.yaml"
     )
@@ -66,6 +72,8 @@ STATE_MAPPING = {
     51: "WY",
 }
 
+STATE_NUMBER_MAPPING = {v: k for k, v in STATE_MAPPING.items()}
+
 
 def get_state_code(state_number):
     """Convert state number to state code."""
@@ -74,8 +82,7 @@ def get_state_code(state_number):
 
 def get_state_number(state_code):
     """Convert state code to state number."""
-    state_mapping_reverse = {v: k for k, v in STATE_MAPPING.items()}
-    return state_mapping_reverse.get(
+    return STATE_NUMBER_MAPPING.get(
         state_code, 0
     )  # Return 0 for invalid state codes
 
@@ -98,17 +105,21 @@ def to_roundedup_number(value):
         return round(value, 2)
 
 
+ORDINALS = (
+    "first",
+    "second",
+    "third",
+    "fourth",
+    "fifth",
+    "sixth",
+    "seventh",
+    "eighth",
+    "ninth",
+    "tenth",
+)
+
+
 def get_ordinal(n):
-    ordinals = {
-        1: "first",
-        2: "second",
-        3: "third",
-        4: "fourth",
-        5: "fifth",
-        6: "sixth",
-        7: "seventh",
-        8: "eighth",
-        9: "ninth",
-        10: "tenth"
-    }
-    return ordinals.get(n, f"{n}th")
+    if 1 <= n <= len(ORDINALS):
+        return ORDINALS[n - 1]
+    return f"{n}th"
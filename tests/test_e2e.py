@@ -104,6 +104,7 @@ class E2ETest(unittest.TestCase):
             raise Exception(
                 f"PolicyEngine TAXSIM CLI failed: {process.returncode}"
             )
+        return process.stdout
 
     def generate_taxsim35_output(self, taxsim35_input_file, output_file):
         import tempfile
@@ -260,6 +261,18 @@ class E2ETest(unittest.TestCase):
         self.assertTrue(all_matched,
                         f"Columns with missmatches: {[col for col, matched in comparison_results.items() if not matched]}")
 
+    def test_workers_match_sequential_output(self):
+        cmd = [
+            sys.executable,
+            str(self.cli_path.absolute()),
+            str(self.input_file_single_household.absolute()),
+        ]
+
+        sequential_output = self.generate_pe_taxsim_output(cmd)
+        parallel_output = self.generate_pe_taxsim_output(cmd + ["--workers", "2"])
+
+        self.assertEqual(sequential_output, parallel_output)
+
     def test_generate_policyengine_taxsim_joint_household_output(self):
         output_file = self.output_dir / self.JOINT_HOUSEHOLD_PE_TAXSIM_OUTPUT
 
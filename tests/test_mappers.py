@@ -400,3 +400,4 @@ def test_roundtrip(sample_taxsim_input):
     # Again, we can't easily check the exact tax values, but we can ensure they exist
     assert "fiitax" in taxsim_output
     assert "siitax" in taxsim_output
+
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+import pytest
+
+
+# Each import order runs in a fresh interpreter, so an earlier import in the
+# test session can't hide an order-dependent binding of the cli attribute
+@pytest.mark.parametrize(
+    "imports",
+    [
+        "from policyengine_taxsim import cli\nfrom policyengine_taxsim.cli import main",
+        "from policyengine_taxsim.cli import main\nfrom policyengine_taxsim import cli",
+        "import policyengine_taxsim.cli\nfrom policyengine_taxsim import cli\n"
+        "from policyengine_taxsim.cli import main",
+    ],
+)
+def test_package_exports_cli_command(imports):
+    check = (
+        f"{imports}\n"
+        "import click\n"
+        "import policyengine_taxsim\n"
+        "assert isinstance(cli, click.Command), type(cli)\n"
+        "assert cli is main\n"
+        "assert policyengine_taxsim.cli is main\n"
+    )
+    process = subprocess.run(
+        [sys.executable, "-c", check], capture_output=True, text=True
+    )
+    assert process.returncode == 0, process.stderr